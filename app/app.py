@@ -18,9 +18,11 @@ For simplicity, this POC keeps related functionality together in single files.
 
 import os
 import logging
+import orjson
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 # SQLAlchemy is imported via models.py as 'db'
-from flask_migrate import Migrate
+# Flask-Migrate (and Alembic behind it) is imported lazily in create_app()
 from config import get_config
 from routes import bp
 from models import db
@@ -29,20 +31,68 @@ from models import db
 # APPLICATION SETUP
 # =============================================================================
 
-# Configure logging for the application
-logging.basicConfig(level=logging.INFO)
+# Load configuration from environment variables
+config = get_config()
+
+# Configure logging for the application (WARNING in production, see config.py)
+logging.basicConfig(level=config['LOG_LEVEL'])
 logger = logging.getLogger(__name__)
 
+
+class ORJSONProvider(JSONProvider):
+    """
+    JSON provider backed by orjson
+
+    orjson serializes in C and encodes datetime objects natively, so models
+    and routes can return datetimes without calling isoformat(). Naive
+    datetimes are stored as UTC (datetime.utcnow) and encoded with +00:00.
+    Types orjson doesn't know fall back to Flask's default handling.
+    """
+
+    #: Like DefaultJSONProvider.compact: None pretty-prints responses in
+    #: debug mode only, False always, True never. dumps() stays compact.
+    compact = None
+
+    def _option(self, sort_keys=False, indent=None):
+        option = orjson.OPT_NAIVE_UTC
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            # orjson only supports two-space indentation
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, *, sort_keys=False, indent=None, separators=None,
+              default=DefaultJSONProvider.default, **kwargs):
+        # orjson output is always compact; other json.dumps options have no
+        # orjson equivalent, so reject them rather than silently ignore them
+        if separators not in (None, (',', ':')):
+            kwargs['separators'] = separators
+        if kwargs:
+            raise TypeError(f"Unsupported orjson dumps options: {', '.join(sorted(kwargs))}")
+        return orjson.dumps(obj, default=default, option=self._option(sort_keys, indent)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=DefaultJSONProvider.default,
+                            option=self._option(indent=2 if pretty else None))
+        return self._app.response_class(body, mimetype='application/json')
+
+
 # Initialize Flask application
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
-# Load configuration from environment variables
-config = get_config()
+# Apply configuration loaded above
 app.config.update(config)
 
 # Initialize database connection
 db.init_app(app)
-migrate = Migrate(app, db)
 
 # Make database available globally for easy access
 app.db = db
@@ -56,6 +106,11 @@ app.register_blueprint(bp)
 # DATABASE INITIALIZATION
 # =============================================================================
 
+# init-db.sql is copied next to app.py in the image and never changes while
+# the process runs, so it is located once at import
+_INIT_SQL_PATH = os.path.join(os.path.dirname(__file__), 'init-db.sql')
+_INIT_SQL_EXISTS = os.path.isfile(_INIT_SQL_PATH)
+
 
 def init_db():
     """
@@ -73,16 +128,15 @@ def init_db():
         logger.info("Database tables created/verified successfully")
 
         # Run initial data setup if init-db.sql exists
-        init_sql_path = os.path.join(os.path.dirname(__file__), 'init-db.sql')
-        if os.path.exists(init_sql_path):
-            run_init_sql(init_sql_path)
+        if _INIT_SQL_EXISTS:
+            run_init_sql(_INIT_SQL_PATH)
         else:
             logger.info("No init-db.sql found, skipping initial data setup")
 
     except Exception as e:
         # Log the error but don't raise it - let the app continue
         # This handles cases where tables already exist or other DB issues
-        logger.warning(f"Database initialization warning: {e}")
+        logger.warning("Database initialization warning: %s", e)
         logger.info("Continuing with existing database state")
 
 
@@ -92,26 +146,33 @@ def run_init_sql(sql_file_path):
 
     This function:
     - Reads SQL commands from the initialization file
-    - Executes them using SQLAlchemy connection
-    - Handles PostgreSQL-specific commands
+    - Sends the whole script to the database driver in a single call
+    - Uses sqlite3's executescript() for SQLite (development/testing)
     - Provides error handling for SQL execution
     """
     try:
         with open(sql_file_path, 'r') as f:
             sql_content = f.read()
 
-        # Split SQL commands by semicolon and execute each
-        sql_commands = [cmd.strip() for cmd in sql_content.split(';') if cmd.strip()]
-
-        for command in sql_commands:
-            if command:
-                db.session.execute(db.text(command))
-
-        db.session.commit()
-        logger.info(f"Successfully executed SQL from {sql_file_path}")
+        # Execute the script as-is rather than splitting on ';', which breaks
+        # on semicolons inside strings or DO $$ blocks and costs a round trip
+        # per statement
+        raw_connection = db.engine.raw_connection()
+        try:
+            if db.engine.dialect.name == 'sqlite':
+                raw_connection.executescript(sql_content)
+            else:
+                cursor = raw_connection.cursor()
+                cursor.execute(sql_content)
+                cursor.close()
+            raw_connection.commit()
+        finally:
+            raw_connection.close()
+
+        logger.info("Successfully executed SQL from %s", sql_file_path)
 
     except Exception as e:
-        logger.warning(f"Failed to execute init SQL: {e}")
+        logger.warning("Failed to execute init SQL: %s", e)
         db.session.rollback()
 
 
@@ -144,13 +205,22 @@ def create_app():
 
     This function creates and configures the Flask application.
     Used by Gunicorn to initialize the app in production.
+
+    Flask-Migrate is registered here rather than at import time: it pulls
+    in Alembic, which is most of the module's import cost and is only
+    needed for the `flask db` CLI (FLASK_APP points at this factory).
     """
     with app.app_context():
         init_db()
+
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
     return app
 
 
-# For direct execution (development/testing)
+# For direct execution (local debugging only - production uses gunicorn.conf.py)
 if __name__ == '__main__':
     # Initialize database for direct execution
     with app.app_context():
@@ -162,5 +232,5 @@ if __name__ == '__main__':
     # avoids bandit error for open ip
     host = os.environ.get('HOST', '0.0.0.0')  # nosec B104
 
-    logger.info(f"Starting Flask application on {host}:{port}")
+    logger.info("Starting Flask application on %s:%s", host, port)
     app.run(host=host, port=port, debug=debug)  # nosec B104
@@ -4,7 +4,20 @@ Configuration for the CircleCI Demo Application
 Simple configuration management for the POC.
 """
 
+import logging
 import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, StaticPool
+
+
+class Config(dict):
+    """Configuration dictionary that also supports attribute access (config.PORT)"""
+    
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
 
 
 def get_database_url():
@@ -20,7 +33,52 @@ def get_database_url():
     db_port = os.environ.get('DB_PORT', '5432')
     db_name = os.environ.get('DB_NAME', 'appdb')
     
-    return f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
+    # Name the driver explicitly - the pool/batch options below are psycopg2's
+    return f'postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
+
+
+def get_engine_options(database_url):
+    """Get SQLAlchemy engine options for the production database"""
+    # PgBouncer in transaction mode already pools connections server-side;
+    # holding our own pool (or pinging) leaves sessions idle in transaction
+    if os.environ.get('DB_USE_PGBOUNCER', 'false').lower() == 'true':
+        options = {
+            'poolclass': NullPool,
+            'pool_pre_ping': False
+        }
+    else:
+        options = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+            'pool_timeout': 30,
+            'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': True
+        }
+    
+    # Batch executemany() INSERTs into multi-row statements (psycopg2 only)
+    if make_url(database_url).get_dialect().driver == 'psycopg2':
+        options.update({
+            'executemany_mode': 'values_plus_batch',
+            'insertmanyvalues_page_size': 1000,
+            'executemany_batch_page_size': 500
+        })
+    
+    return options
+
+
+def get_log_level(env):
+    """Get the log level name, falling back to the environment's default"""
+    # Production skips INFO records entirely; override with LOG_LEVEL
+    default = 'WARNING' if env == 'production' else 'INFO'
+    level = os.environ.get('LOG_LEVEL', default).upper()
+    
+    # logging.basicConfig() raises on unknown names like 'VERBOSE'
+    if level not in logging.getLevelNamesMapping():
+        logging.getLogger(__name__).warning(
+            "Unknown LOG_LEVEL %r, using %s", os.environ['LOG_LEVEL'], default
+        )
+        return default
+    return level
 
 
 def get_config():
@@ -28,21 +86,30 @@ def get_config():
     env = os.environ.get('FLASK_ENV', 'development')
     
     # Simple configuration dictionary
-    config = {
+    config = Config({
         'SECRET_KEY': os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production'),
         'SQLALCHEMY_TRACK_MODIFICATIONS': False,
         'PORT': int(os.environ.get('PORT', 5000)),
         'DEBUG': env == 'development',
+        'HEALTH_PERSIST': os.environ.get('HEALTH_PERSIST', 'false').lower() == 'true',
+        'LOG_LEVEL': get_log_level(env),
         'FLASK_ENV': env
-    }
+    })
     
     # Set database URL based on environment
     if env == 'development':
         config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
     elif env == 'testing':
         config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        # One shared connection, so every thread and pool checkout sees the
+        # same in-memory database instead of a fresh empty one
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False}
+        }
         config['TESTING'] = True
     else:  # production
         config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(config['SQLALCHEMY_DATABASE_URI'])
     
     return config
\ No newline at end of file
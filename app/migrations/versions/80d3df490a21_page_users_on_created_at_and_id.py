@@ -0,0 +1,46 @@
+"""Page users on created_at and id
+
+Revision ID: 80d3df490a21
+Revises: 
+Create Date: 2026-10-14 11:39:58.085144
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '80d3df490a21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows seeded by init-db.sql before it set created_at have NULL
+    # timestamps, which the (created_at, id) keyset cursor can't reach
+    users = sa.table('users', sa.column('created_at', sa.DateTime))
+    op.execute(
+        users.update()
+        .where(users.c.created_at.is_(None))
+        .values(created_at=sa.func.current_timestamp())
+    )
+
+    # db.create_all() already builds the new index on fresh databases
+    op.drop_index('ix_users_created_at_desc', table_name='users', if_exists=True)
+    op.create_index(
+        'ix_users_created_at_id_desc',
+        'users',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_created_at_id_desc', table_name='users', if_exists=True)
+    op.create_index(
+        'ix_users_created_at_desc',
+        'users',
+        [sa.text('created_at DESC')],
+        if_not_exists=True,
+    )
@@ -22,7 +22,16 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # server_default covers rows inserted outside the ORM (init-db.sql), so
+    # created_at is never NULL for keyset pagination
+    created_at = db.Column(db.DateTime, default=datetime.utcnow,
+                           server_default=db.func.current_timestamp())
+    
+    # Newest-first listings (index page, /api/users) read this index in order
+    # instead of sorting the whole table
+    __table_args__ = (
+        db.Index('ix_users_created_at_id_desc', created_at.desc(), id.desc()),
+    )
     
     def to_dict(self):
         """Convert to dictionary for JSON responses"""
@@ -30,7 +39,7 @@ class User(db.Model):
             'id': self.id,
             'username': self.username,
             'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def __repr__(self):
@@ -53,7 +62,7 @@ class HealthCheck(db.Model):
         """Convert to dictionary for JSON responses"""
         return {
             'id': self.id,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'timestamp': self.timestamp,
             'status': self.status
         }
     
@@ -13,11 +13,16 @@ Routes included:
 
 import os
 import logging
-from datetime import datetime
-from flask import Blueprint, render_template, jsonify, request, current_app
+import hashlib
+import functools
+import threading
+from datetime import datetime, timezone
+from flask import Blueprint, Response, render_template, jsonify, make_response, request, current_app
 from werkzeug.exceptions import NotFound
-from sqlalchemy import text
-from models import User, HealthCheck
+from sqlalchemy import func, insert, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from models import db, User, HealthCheck
 
 # =============================================================================
 # ROUTE SETUP
@@ -29,8 +34,114 @@ bp = Blueprint('main', __name__)
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+# Deployment environment shown on the index page (fixed for the process)
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
+
+# Columns serialized for user listings - selecting them directly skips
+# building full ORM entities just to turn them back into dicts
+_USER_COLUMNS = (User.id, User.username, User.email, User.created_at)
+
+# Static statements built once at import instead of on every request
+_PING = text('SELECT 1')
+_COUNT_USERS = select(func.count(User.id))
+# Planner's row estimate (kept current by ANALYZE/autovacuum) - O(1) vs a
+# sequential scan for COUNT(*)
+_ESTIMATE_USERS_POSTGRESQL = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass")
+# created_at isn't unique (bulk inserts share timestamps), so id breaks ties
+# and makes the order total - keyset pages can't skip or repeat rows
+_USERS_NEWEST_FIRST = select(*_USER_COLUMNS).order_by(User.created_at.desc(), User.id.desc())
+_RECENT_USERS = _USERS_NEWEST_FIRST.limit(5)
+
+# Page size bounds for GET /api/users
+DEFAULT_USERS_LIMIT = 100
+MAX_USERS_LIMIT = 1000
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT DO NOTHING
+_INSERT_ON_CONFLICT = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
 # Global flag for database initialization (lazy initialization for Gunicorn)
+# The lock keeps concurrent first requests on gthread workers from both
+# running init_db()
 _db_initialized = False
+_db_init_lock = threading.Lock()
+
+
+def user_row_to_dict(row):
+    """Convert a row of _USER_COLUMNS to the same shape as User.to_dict()"""
+    return {
+        'id': row.id,
+        'username': row.username,
+        'email': row.email,
+        'created_at': row.created_at
+    }
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp into the naive UTC form stored in the database"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def users_cursor(row):
+    """Build the opaque 'next' cursor for the last row of a /api/users page"""
+    return f"{row.created_at.isoformat()},{row.id}"
+
+
+def parse_users_cursor(value):
+    """Split a users cursor into its (created_at, id) keyset position"""
+    timestamp, _, user_id = value.rpartition(',')
+    return parse_timestamp(timestamp), int(user_id)
+
+
+def users_etag(rows, limit, after):
+    """
+    Build the /api/users ETag from the fetched page and its parameters
+    
+    Hashing every column the page serializes means a create, delete or
+    edit that changes what the page shows changes the tag, without a
+    table-wide aggregate on every request.
+    """
+    key = '|'.join([str(limit), after or ''] + [
+        f"{row.id}:{row.username}:{row.email}:"
+        f"{row.created_at.isoformat() if row.created_at else ''}"
+        for row in rows
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def no_store(view):
+    """Mark every response of a view as uncacheable"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    return wrapper
+
+
+def count_users():
+    """
+    Count users for health reporting
+    
+    Returns (count, estimated). On PostgreSQL the catalog estimate is used
+    once the table has been analyzed; other databases get an exact COUNT(*).
+    An unanalyzed table reports reltuples = -1 on PostgreSQL 14+ but 0 on
+    13 (what we deploy), and autovacuum may never analyze a small table, so
+    any estimate <= 0 is confirmed with COUNT(*) - cheap on an empty or
+    near-empty table.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        estimate = db.session.scalar(_ESTIMATE_USERS_POSTGRESQL)
+        if estimate is not None and estimate > 0:
+            return estimate, True
+    
+    # scalar() hands back the bare count without building Row objects
+    return db.session.scalar(_COUNT_USERS) or 0, False
 
 
 def ensure_db_initialized():
@@ -39,17 +150,24 @@ def ensure_db_initialized():
     
     This function implements lazy database initialization to avoid
     application context issues when running with Gunicorn. It only
-    initializes the database once per worker process.
+    initializes the database once per worker process, using a
+    double-checked lock so the common already-initialized path never
+    blocks.
     """
     global _db_initialized
-    if not _db_initialized:
+    if _db_initialized:
+        return
+    
+    with _db_init_lock:
+        if _db_initialized:
+            return
         try:
             from app import init_db
             init_db()
             _db_initialized = True
             logger.info("Database initialized on first request")
         except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
+            logger.error("Failed to initialize database: %s", e)
 
 
 # =============================================================================
@@ -69,27 +187,22 @@ def index():
     """
     ensure_db_initialized()
     
-    # Test database connection
+    # Get recent users - a successful query also proves connectivity,
+    # so no separate SELECT 1 round trip is needed
     try:
-        current_app.db.session.execute(text('SELECT 1'))
+        rows = db.session.execute(_RECENT_USERS).all()
+        user_list = [user_row_to_dict(row) for row in rows]
         db_status = 'Connected'
     except Exception as e:
-        logger.error(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         db_status = 'Disconnected'
-    
-    # Get recent users
-    try:
-        users = User.query.order_by(User.created_at.desc()).limit(5).all()
-        user_list = [user.to_dict() for user in users]
-    except Exception as e:
-        logger.error(f"Error fetching users: {e}")
         user_list = []
     
     return render_template(
         'index.html',
         status='Running',
         db_status=db_status,
-        environment=os.environ.get('ENVIRONMENT', 'development'),
+        environment=ENVIRONMENT,
         users=user_list
     )
 
@@ -99,61 +212,70 @@ def index():
 # =============================================================================
 
 @bp.route('/health')
+@no_store
 def health_check():
     """
     Health check endpoint for load balancers
     
     This endpoint provides basic health status for load balancers
-    and monitoring systems. It tests database connectivity and
-    records the health check request.
+    and monitoring systems. It tests database connectivity with a
+    read-only query; when HEALTH_PERSIST is enabled it also records the
+    health check request.
     """
     ensure_db_initialized()
     
     try:
-        current_app.db.session.execute(text('SELECT 1'))
-        
-        # Record health check
-        health_record = HealthCheck(status='healthy')
-        current_app.db.session.add(health_record)
-        current_app.db.session.commit()
+        if current_app.config['HEALTH_PERSIST']:
+            # Record health check - the commit itself exercises the connection
+            health_record = HealthCheck(status='healthy')
+            db.session.add(health_record)
+            db.session.commit()
+            timestamp = health_record.timestamp
+        else:
+            # Probes hit this every few seconds - don't write on each one
+            db.session.execute(_PING)
+            timestamp = datetime.utcnow()
         
         return jsonify({
             'status': 'healthy',
-            'timestamp': health_record.timestamp.isoformat(),
+            'timestamp': timestamp,
             'database': 'connected',
             'version': '1.0.0'
         })
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        db.session.rollback()
+        logger.error("Health check failed: %s", e)
         return jsonify({
             'status': 'unhealthy',
             'error': str(e),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 500
 
 
 @bp.route('/api/health')
+@no_store
 def api_health():
     """
     API health check with database test
     
     This endpoint provides detailed health information including
-    database connectivity and user count statistics.
+    database connectivity and user count statistics. On PostgreSQL the
+    user count is the planner's estimate ('user_count_is_estimate': true).
     """
     ensure_db_initialized()
     
     try:
-        result = current_app.db.session.execute(text('SELECT COUNT(*) as count FROM users')).fetchone()
-        user_count = result.count if result else 0
+        user_count, estimated = count_users()
         
         return jsonify({
             'status': 'healthy',
             'database': 'connected',
             'user_count': user_count,
-            'timestamp': datetime.utcnow().isoformat()
+            'user_count_is_estimate': estimated,
+            'timestamp': datetime.utcnow()
         })
     except Exception as e:
-        logger.error(f"API health check failed: {e}")
+        logger.error("API health check failed: %s", e)
         return jsonify({
             'status': 'unhealthy',
             'error': str(e)
@@ -167,16 +289,45 @@ def api_health():
 @bp.route('/api/users', methods=['GET'])
 def get_users():
     """
-    Get all users
+    Get users, newest first
     
-    This endpoint retrieves all users from the database and returns
-    them as a JSON array with user information.
+    This endpoint returns one page of users as {'users': [...], 'next': ...}.
+    Pages are bounded by ?limit= (default 100, max 1000) and use keyset
+    pagination on (created_at, id): pass the previous page's 'next' cursor
+    as ?after= to get the users that follow it. 'next' is null on the last
+    page.
+    
+    Responses carry a weak ETag derived from the rows on the page, so
+    clients sending If-None-Match get an empty 304 (no serialization or
+    body) while the page is unchanged.
     """
     try:
-        users = User.query.order_by(User.created_at.desc()).all()
-        return jsonify([user.to_dict() for user in users])
+        limit = min(max(int(request.args.get('limit', DEFAULT_USERS_LIMIT)), 1), MAX_USERS_LIMIT)
+        after = request.args.get('after')
+        
+        query = _USERS_NEWEST_FIRST.limit(limit)
+        if after:
+            query = query.where(tuple_(User.created_at, User.id) < parse_users_cursor(after))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or after parameter'}), 400
+    
+    try:
+        rows = db.session.execute(query).all()
+        
+        etag = users_etag(rows, limit, after)
+        if request.if_none_match.contains_weak(etag):
+            not_modified = Response(status=304)
+            not_modified.set_etag(etag, weak=True)
+            return not_modified
+        
+        response = jsonify({
+            'users': [user_row_to_dict(row) for row in rows],
+            'next': users_cursor(rows[-1]) if len(rows) == limit else None
+        })
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
-        logger.error(f"Error fetching users: {e}")
+        logger.error("Error fetching users: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -186,38 +337,75 @@ def create_user():
     Create a new user
     
     This endpoint creates a new user with the provided username and email.
-    It validates that the user doesn't already exist before creating.
+    The insert skips rows that collide with the unique username/email
+    constraints, so creating and duplicate-checking is a single round trip.
+    A JSON array of users is inserted as a single batched statement.
     """
     try:
         data = request.get_json()
         
+        if isinstance(data, list):
+            return create_users_bulk(data)
+        
         if not data or not data.get('username') or not data.get('email'):
             return jsonify({'error': 'Username and email are required'}), 400
         
-        # Check if user already exists
-        existing_user = User.query.filter(
-            (User.username == data['username']) | (User.email == data['email'])
-        ).first()
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING - no row means the
+        # username or email already exists
+        dialect_insert = _INSERT_ON_CONFLICT[db.engine.dialect.name]
+        stmt = (
+            dialect_insert(User)
+            .values(username=data['username'], email=data['email'])
+            .on_conflict_do_nothing()
+            .returning(*_USER_COLUMNS)
+        )
+        row = db.session.execute(stmt).first()
         
-        if existing_user:
+        if row is None:
             return jsonify({
                 'error': 'User with this username or email already exists'
             }), 409
         
-        # Create new user
-        user = User(username=data['username'], email=data['email'])
-        current_app.db.session.add(user)
-        current_app.db.session.commit()
+        db.session.commit()
         
-        logger.info(f"Created user: {user.username}")
-        return jsonify(user.to_dict()), 201
+        logger.info("Created user: %s", row.username)
+        return jsonify(user_row_to_dict(row)), 201
         
     except Exception as e:
-        current_app.db.session.rollback()
-        logger.error(f"Error creating user: {e}")
+        db.session.rollback()
+        logger.error("Error creating user: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+def create_users_bulk(users_data):
+    """
+    Create many users in one INSERT
+    
+    Executing a Core insert with a list of parameter sets lets the driver
+    batch the rows into multi-row statements instead of one round trip
+    per user. Duplicates are reported by the unique constraints.
+    """
+    if not users_data or not all(
+        isinstance(user, dict) and user.get('username') and user.get('email')
+        for user in users_data
+    ):
+        return jsonify({'error': 'Username and email are required'}), 400
+    
+    rows = [{'username': user['username'], 'email': user['email']} for user in users_data]
+    
+    try:
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({
+            'error': 'User with this username or email already exists'
+        }), 409
+    
+    logger.info("Created %d users", len(rows))
+    return jsonify({'created': len(rows)}), 201
+
+
 @bp.route('/api/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     """
@@ -226,21 +414,21 @@ def delete_user(user_id):
     This endpoint deletes a user by their ID.
     """
     try:
-        user = current_app.db.session.get(User, user_id)
+        user = db.session.get(User, user_id)
         if not user:
             raise NotFound()
-        current_app.db.session.delete(user)
-        current_app.db.session.commit()
+        db.session.delete(user)
+        db.session.commit()
         
-        logger.info(f"Deleted user: {user.username}")
+        logger.info("Deleted user: %s", user.username)
         return jsonify({'message': 'User deleted successfully'})
         
     except NotFound:
         return jsonify({'error': 'User not found'}), 404
         
     except Exception as e:
-        current_app.db.session.rollback()
-        logger.error(f"Error deleting user: {e}")
+        db.session.rollback()
+        logger.error("Error deleting user: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -257,8 +445,8 @@ def init_database():
     Useful for development and testing purposes.
     """
     try:
-        current_app.db.create_all()
+        db.create_all()
         return jsonify({'message': 'Database initialized successfully'})
     except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
+        logger.error("Database initialization failed: %s", e)
         return jsonify({'error': str(e)}), 500
@@ -113,7 +113,7 @@ class UIManager {
     async loadUsers() {
         try {
             this.showLoading(this.userList);
-            const users = await this.apiClient.getUsers();
+            const { users } = await this.apiClient.getUsers();
             
             if (Array.isArray(users) && users.length > 0) {
                 const userHTML = users.map(user => `
@@ -19,77 +19,170 @@ Framework Benefits:
 """
 
 import os
+import shutil
 import pytest
 import tempfile
-from app import app, db
-from models import User, HealthCheck
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+
+# Use in-memory SQLite for testing. The engine is built by db.init_app() when
+# app is imported, so the testing config must be selected before the import;
+# otherwise every xdist worker would share (and drop tables in) app.db
+os.environ['FLASK_ENV'] = 'testing'
+
+from app import app, create_app, db  # noqa: E402
+from models import User, HealthCheck  # noqa: E402
+
+app.config['WTF_CSRF_ENABLED'] = False
+
+
+def _enable_sqlite_savepoints(engine):
+    """
+    Let SQLAlchemy own SQLite transactions so SAVEPOINTs nest correctly
+
+    pysqlite defers BEGIN until the first DML statement, so a RELEASE of the
+    first savepoint would silently commit the whole test transaction.
+    """
+    @event.listens_for(engine, 'connect')
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        _enable_sqlite_savepoints(db.engine)
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skip tests that need a running container when Docker isn't installed
+
+    The probe runs once per session instead of once per test class: a stat
+    of the Docker socket, falling back to a PATH lookup for the CLI where
+    the socket lives elsewhere (macOS/Windows). Only items marked both
+    container and integration talk to a running container; the other
+    container-marked tests inspect files and config.
+    """
+    if os.path.exists('/var/run/docker.sock') or shutil.which('docker'):
+        return
+
+    skip_container = pytest.mark.skip(reason="Docker not available for container tests")
+    for item in items:
+        if 'container' in item.keywords and 'integration' in item.keywords:
+            item.add_marker(skip_container)
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    """Build the Flask application once for the whole test session"""
+    return create_app()
+
+
+@pytest.fixture(scope='session')
+def _engine(flask_app):
+    """Resolve the application's default engine once for the whole test session"""
+    # Resolve inside a context but yield outside it, so tests don't all run
+    # under an ambient app context that would hide missing app_context() calls
+    with flask_app.app_context():
+        engine = db.engine
+    yield engine
+
+
+@pytest.fixture(scope='session')
+def _tables(_engine):
+    """Create the database schema once for the whole test session"""
+    with app.app_context():
+        db.create_all()
+    yield
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def db_connection(_engine, _tables, monkeypatch):
+    """
+    Run each test inside an outer transaction that is rolled back afterwards
+
+    The default engine is swapped for a single connection with an open
+    transaction, so db.session (and db.create_all()) in routes and fixtures all
+    share it. Teardown rolls back the outer transaction instead of dropping
+    tables.
+    """
+    with app.app_context():
+        connection = _engine.connect()
+        transaction = connection.begin()
+        monkeypatch.setitem(db.engines, None, connection)
+
+        yield connection
+
+        db.session.remove()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture
-def client():
+def db_session(db_connection, monkeypatch):
+    """
+    Scoped session that joins the test's outer transaction
+
+    create_savepoint mode starts a SAVEPOINT for every session transaction,
+    so commits and rollbacks in routes only release or roll back that
+    SAVEPOINT and no after_transaction_end listener is needed.
+    """
+    monkeypatch.setitem(db.session.session_factory.kw, 'join_transaction_mode', 'create_savepoint')
+    return db.session
+
+
+@pytest.fixture
+def client(db_session):
     """Create a test client for the Flask application"""
-    # Use in-memory SQLite for testing
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    app.config['WTF_CSRF_ENABLED'] = False
-    
     with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-            yield client
-            db.drop_all()
+        yield client
 
 
 @pytest.fixture
-def app_context():
+def app_context(db_session):
     """Create an application context for testing"""
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    
     with app.app_context():
-        db.create_all()
         yield app
-        db.drop_all()
 
 
 @pytest.fixture
-def sample_user(client):
-    """Create a sample user for testing"""
+def sample_user(client, db_connection):
+    """Create a sample user inside the test's rolled-back transaction"""
     user_data = {
         'username': 'testuser',
         'email': 'test@example.com'
     }
     
-    with app.app_context():
-        user = User(**user_data)
-        db.session.add(user)
-        db.session.commit()
-        # Return user data instead of the object to avoid detached instance issues
-        return {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email
-        }
+    # Written on the outer transaction, so requests see the row without a
+    # commit and a rolled-back request SAVEPOINT can't discard it
+    row = db_connection.execute(
+        insert(User).values(**user_data).returning(User.id, User.username, User.email)
+    ).one()
+    return dict(row._mapping)
 
 
 @pytest.fixture
-def multiple_users(client):
-    """Create multiple users for testing"""
+def multiple_users(client, db_connection):
+    """Create multiple users inside the test's rolled-back transaction"""
     users_data = [
         {'username': 'user1', 'email': 'user1@example.com'},
         {'username': 'user2', 'email': 'user2@example.com'},
         {'username': 'user3', 'email': 'user3@example.com'}
     ]
     
-    users = []
-    with app.app_context():
-        for user_data in users_data:
-            user = User(**user_data)
-            db.session.add(user)
-            users.append({
-                'id': user.id,
-                'username': user.username,
-                'email': user.email
-            })
-        db.session.commit()
-        return users
+    # One executemany INSERT instead of a unit-of-work flush per object.
+    # rollback_only joins the outer transaction without a SAVEPOINT, so the
+    # flushed rows outlive this session without a commit
+    with Session(bind=db_connection, join_transaction_mode='rollback_only') as session:
+        session.bulk_insert_mappings(User, users_data)
+        session.flush()
+    rows = db_connection.execute(
+        select(User.id, User.username, User.email).order_by(User.id)
+    ).all()
+    return [dict(row._mapping) for row in rows]
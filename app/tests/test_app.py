@@ -13,7 +13,8 @@ Test Categories:
 
 Database Strategy:
 - Uses SQLite in-memory database for unit tests (fast, isolated)
-- Each test gets a fresh database instance via fixtures
+- Schema is created once per session; each test runs inside a
+  transaction that is rolled back on teardown
 - Tests database models, relationships, and constraints
 - Validates JSON serialization and API responses
 
@@ -24,17 +25,22 @@ CircleCI Integration:
 - Coverage threshold enforced at 70% minimum
 
 Test Fixtures:
+- db_session: Per-test transaction rolled back on teardown
 - client: Flask test client with SQLite database
 - app_context: Application context for database operations  
 - sample_user: Pre-created user for testing
 - multiple_users: Multiple users for list/query testing
 """
 
-import json
+import re
 import pytest
+from sqlalchemy import func, text, update
 from app import app, db
 from models import User, HealthCheck
 
+# Title and status section of the rendered index page, matched in one scan
+_INDEX_PAT = re.compile(rb'(?s)CircleCI Demo POC.*?Application Status')
+
 # pytest markers for better test organization and JUnit XML categorization
 
 
@@ -66,34 +72,79 @@ class TestHealthEndpoints:
         response = client.get('/health')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'healthy'
         assert 'timestamp' in data
         assert data['database'] == 'connected'
         assert data['version'] == '1.0.0'
     
+    def test_health_endpoints_not_cached(self, client):
+        """Test health responses are never cached"""
+        assert client.get('/health').headers['Cache-Control'] == 'no-store'
+        assert client.get('/api/health').headers['Cache-Control'] == 'no-store'
+    
     def test_api_health_endpoint(self, client):
         """Test the API health endpoint"""
         response = client.get('/api/health')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'healthy'
         assert data['database'] == 'connected'
         assert 'user_count' in data
+        assert data['user_count_is_estimate'] is False  # exact COUNT(*) on SQLite
         assert 'timestamp' in data
     
-    def test_health_check_creates_record(self, client):
-        """Test that health check creates a database record"""
+    def test_api_health_uses_postgresql_estimate(self, client, monkeypatch):
+        """Test PostgreSQL reports the catalog row estimate instead of COUNT(*)"""
+        import routes
+        
         with app.app_context():
-            initial_count = HealthCheck.query.count()
-            
-        response = client.get('/health')
-        assert response.status_code == 200
+            monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+        monkeypatch.setattr(routes, '_ESTIMATE_USERS_POSTGRESQL', text('SELECT 42'))
+        
+        data = client.get('/api/health').get_json()
+        assert data['user_count'] == 42
+        assert data['user_count_is_estimate'] is True
+    
+    @pytest.mark.parametrize('reltuples', [-1, 0], ids=['postgresql14', 'postgresql13'])
+    def test_api_health_unanalyzed_table_falls_back_to_count(self, client, sample_user,
+                                                              monkeypatch, reltuples):
+        """Test a never-analyzed table (reltuples -1 on PG14+, 0 on PG13) falls back to COUNT(*)"""
+        import routes
+        
+        with app.app_context():
+            monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+        monkeypatch.setattr(routes, '_ESTIMATE_USERS_POSTGRESQL', text(f'SELECT {reltuples}'))
+        
+        data = client.get('/api/health').get_json()
+        assert data['user_count'] == 1
+        assert data['user_count_is_estimate'] is False
+    
+    def test_health_check_creates_record(self, client, monkeypatch):
+        """Test that health check creates a database record when persisting"""
+        monkeypatch.setitem(app.config, 'HEALTH_PERSIST', True)
         
         with app.app_context():
-            final_count = HealthCheck.query.count()
+            initial_count = db.session.query(func.count(HealthCheck.id)).scalar()
+            
+            response = client.get('/health')
+            assert response.status_code == 200
+            
+            final_count = db.session.query(func.count(HealthCheck.id)).scalar()
             assert final_count == initial_count + 1
+    
+    def test_health_check_skips_record_by_default(self, client):
+        """Test that health check is read-only unless HEALTH_PERSIST is set"""
+        assert app.config['HEALTH_PERSIST'] is False
+        
+        with app.app_context():
+            initial_count = db.session.query(func.count(HealthCheck.id)).scalar()
+            
+            response = client.get('/health')
+            assert response.status_code == 200
+            
+            assert db.session.query(func.count(HealthCheck.id)).scalar() == initial_count
 
 
 @pytest.mark.unit
@@ -107,9 +158,9 @@ class TestUserEndpoints:
         response = client.get('/api/users')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
-        assert isinstance(data, list)
-        assert len(data) == 0
+        data = response.get_json()
+        assert data['users'] == []
+        assert data['next'] is None
     
     def test_create_user(self, client):
         """Test creating a new user"""
@@ -119,12 +170,11 @@ class TestUserEndpoints:
         }
         
         response = client.post('/api/users', 
-                             data=json.dumps(user_data),
-                             content_type='application/json')
+                             json=user_data)
         
         assert response.status_code == 201
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['username'] == user_data['username']
         assert data['email'] == user_data['email']
         assert 'id' in data
@@ -134,13 +184,11 @@ class TestUserEndpoints:
         """Test creating a user with missing data"""
         incomplete_data = {'username': 'onlyusername'}
         
-        response = client.post('/api/users',
-                             data=json.dumps(incomplete_data),
-                             content_type='application/json')
+        response = client.post('/api/users', json=incomplete_data)
         
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'required' in data['error'].lower()
     
@@ -151,22 +199,71 @@ class TestUserEndpoints:
             'email': 'different@example.com'
         }
         
-        response = client.post('/api/users',
-                             data=json.dumps(duplicate_data),
-                             content_type='application/json')
+        response = client.post('/api/users', json=duplicate_data)
         
         assert response.status_code == 409
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'already exists' in data['error']
     
+    def test_create_duplicate_email(self, client, sample_user):
+        """Test creating a user whose email is already taken"""
+        duplicate_data = {
+            'username': 'differentuser',
+            'email': sample_user['email']
+        }
+        
+        response = client.post('/api/users', json=duplicate_data)
+        
+        assert response.status_code == 409
+        
+        users = client.get('/api/users').get_json()['users']
+        assert len(users) == 1
+    
+    def test_create_users_bulk(self, client):
+        """Test creating several users from a JSON array"""
+        users_data = [
+            {'username': 'bulk1', 'email': 'bulk1@example.com'},
+            {'username': 'bulk2', 'email': 'bulk2@example.com'}
+        ]
+        
+        response = client.post('/api/users', json=users_data)
+        
+        assert response.status_code == 201
+        
+        data = response.get_json()
+        assert data['created'] == 2
+        
+        users = client.get('/api/users').get_json()['users']
+        assert {user['username'] for user in users} == {'bulk1', 'bulk2'}
+    
+    def test_create_users_bulk_missing_data(self, client):
+        """Test bulk creation rejects entries without username or email"""
+        response = client.post('/api/users', json=[{'username': 'onlyusername'}])
+        
+        assert response.status_code == 400
+    
+    def test_create_users_bulk_duplicate(self, client, sample_user):
+        """Test bulk creation reports duplicates as a conflict"""
+        users_data = [
+            {'username': 'fresh', 'email': 'fresh@example.com'},
+            {'username': sample_user['username'], 'email': 'other@example.com'}
+        ]
+        
+        response = client.post('/api/users', json=users_data)
+        
+        assert response.status_code == 409
+        
+        users = client.get('/api/users').get_json()['users']
+        assert [user['username'] for user in users] == [sample_user['username']]
+    
     def test_get_users_with_data(self, client, multiple_users):
         """Test getting users when they exist"""
         response = client.get('/api/users')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()['users']
         assert isinstance(data, list)
         assert len(data) == 3
         
@@ -176,6 +273,117 @@ class TestUserEndpoints:
         assert 'user2' in usernames
         assert 'user3' in usernames
     
+    def test_get_users_keyset_pagination(self, client):
+        """Test paging through users with limit and the next cursor"""
+        from datetime import datetime, timedelta
+        
+        base_time = datetime(2024, 1, 1)
+        with app.app_context():
+            for i in range(5):
+                db.session.add(User(username=f'page{i}', email=f'page{i}@example.com',
+                                    created_at=base_time + timedelta(minutes=i)))
+            db.session.commit()
+        
+        first_page = client.get('/api/users?limit=2').get_json()
+        assert [user['username'] for user in first_page['users']] == ['page4', 'page3']
+        assert first_page['next'] is not None
+        
+        second_page = client.get('/api/users', query_string={
+            'limit': 2, 'after': first_page['next']
+        }).get_json()
+        assert [user['username'] for user in second_page['users']] == ['page2', 'page1']
+        
+        last_page = client.get('/api/users', query_string={
+            'limit': 2, 'after': second_page['next']
+        }).get_json()
+        assert [user['username'] for user in last_page['users']] == ['page0']
+        assert last_page['next'] is None
+    
+    def test_get_users_pagination_with_tied_timestamps(self, client):
+        """Test rows sharing created_at are neither skipped nor repeated across pages"""
+        from datetime import datetime
+        
+        created_at = datetime(2024, 1, 1)
+        with app.app_context():
+            db.session.add_all([
+                User(username=f'tie{i}', email=f'tie{i}@example.com', created_at=created_at)
+                for i in range(5)
+            ])
+            db.session.commit()
+        
+        seen = []
+        after = None
+        while True:
+            params = {'limit': 2}
+            if after:
+                params['after'] = after
+            page = client.get('/api/users', query_string=params).get_json()
+            seen.extend(user['username'] for user in page['users'])
+            after = page['next']
+            if after is None:
+                break
+        
+        # Ties fall back to newest id first
+        assert seen == [f'tie{i}' for i in reversed(range(5))]
+    
+    def test_created_at_defaults_outside_the_orm(self, app_context):
+        """Test raw inserts (as in init-db.sql) still get a created_at for paging"""
+        db.session.execute(text(
+            "INSERT INTO users (username, email) VALUES ('raw', 'raw@example.com')"
+        ))
+        created_at = db.session.scalar(text("SELECT created_at FROM users WHERE username = 'raw'"))
+        assert created_at is not None
+    
+    def test_get_users_limit_is_capped(self, client, monkeypatch):
+        """Test the page size can't exceed the server-side maximum"""
+        import routes
+        monkeypatch.setattr(routes, 'MAX_USERS_LIMIT', 2)
+        
+        client.post('/api/users', json=[
+            {'username': f'cap{i}', 'email': f'cap{i}@example.com'} for i in range(3)
+        ])
+        
+        data = client.get('/api/users?limit=50').get_json()
+        assert len(data['users']) == 2
+    
+    def test_get_users_invalid_parameters(self, client):
+        """Test malformed limit or after values are rejected"""
+        assert client.get('/api/users?limit=abc').status_code == 400
+        assert client.get('/api/users?after=not-a-timestamp').status_code == 400
+    
+    def test_get_users_not_modified(self, client, sample_user):
+        """Test repeated requests with a matching ETag get an empty 304"""
+        response = client.get('/api/users')
+        etag = response.headers['ETag']
+        assert etag.startswith('W/')
+        
+        cached = client.get('/api/users', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        
+        # A change to the rows on the page invalidates the ETag
+        client.delete(f'/api/users/{sample_user["id"]}')
+        refreshed = client.get('/api/users', headers={'If-None-Match': etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers['ETag'] != etag
+        
+        # So does a new user appearing at the top of the page
+        client.post('/api/users', json={'username': 'newest', 'email': 'newest@example.com'})
+        latest = client.get('/api/users', headers={'If-None-Match': refreshed.headers['ETag']})
+        assert latest.status_code == 200
+    
+    def test_get_users_etag_tracks_edits(self, client, db_connection, sample_user):
+        """Test editing a listed user's email invalidates the ETag"""
+        etag = client.get('/api/users').headers['ETag']
+        
+        db_connection.execute(
+            update(User).where(User.id == sample_user['id']).values(email='changed@example.com')
+        )
+        
+        response = client.get('/api/users', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['users'][0]['email'] == 'changed@example.com'
+    
     def test_delete_user(self, client, sample_user):
         """Test deleting a user"""
         user_id = sample_user['id']
@@ -183,13 +391,13 @@ class TestUserEndpoints:
         response = client.delete(f'/api/users/{user_id}')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'deleted successfully' in data['message']
         
         # Verify user is actually deleted
         get_response = client.get('/api/users')
-        users_data = json.loads(get_response.data)
+        users_data = get_response.get_json()['users']
         user_ids = [user['id'] for user in users_data]
         assert user_id not in user_ids
     
@@ -209,34 +417,32 @@ class TestDatabaseOperations:
         response = client.get('/api/database/init')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'initialized successfully' in data['message']
     
-    def test_user_model_to_dict(self, client):
+    def test_user_model_to_dict(self, db_session):
         """Test User model to_dict method"""
-        with app.app_context():
-            user = User(username='testuser', email='test@example.com')
-            db.session.add(user)
-            db.session.commit()
-            
-            user_dict = user.to_dict()
-            assert user_dict['username'] == 'testuser'
-            assert user_dict['email'] == 'test@example.com'
-            assert 'id' in user_dict
-            assert 'created_at' in user_dict
+        user = User(username='testuser', email='test@example.com')
+        db_session.add(user)
+        db_session.flush()
+        
+        user_dict = user.to_dict()
+        assert user_dict['username'] == 'testuser'
+        assert user_dict['email'] == 'test@example.com'
+        assert user_dict['id'] is not None
+        assert user_dict['created_at'] is not None
     
-    def test_health_check_model_to_dict(self, client):
+    def test_health_check_model_to_dict(self, db_session):
         """Test HealthCheck model to_dict method"""
-        with app.app_context():
-            health_check = HealthCheck(status='healthy')
-            db.session.add(health_check)
-            db.session.commit()
-            
-            health_dict = health_check.to_dict()
-            assert health_dict['status'] == 'healthy'
-            assert 'id' in health_dict
-            assert 'timestamp' in health_dict
+        health_check = HealthCheck(status='healthy')
+        db_session.add(health_check)
+        db_session.flush()
+        
+        health_dict = health_check.to_dict()
+        assert health_dict['status'] == 'healthy'
+        assert health_dict['id'] is not None
+        assert health_dict['timestamp'] is not None
 
 
 @pytest.mark.unit
@@ -248,16 +454,7 @@ class TestMainRoutes:
         """Test the main index route"""
         response = client.get('/')
         assert response.status_code == 200
-        assert b'CircleCI Demo POC' in response.data
-        assert b'Application Status' in response.data
-    
-    def test_404_error_handler(self, client):
-        """Test 404 error handling"""
-        response = client.get('/nonexistent-endpoint')
-        assert response.status_code == 404
-        
-        data = json.loads(response.data)
-        assert data['error'] == 'Not found'
+        assert _INDEX_PAT.search(response.data)
 
 
 @pytest.mark.integration
@@ -274,19 +471,17 @@ class TestIntegration:
             'email': 'workflow@example.com'
         }
         
-        create_response = client.post('/api/users',
-                                    data=json.dumps(user_data),
-                                    content_type='application/json')
+        create_response = client.post('/api/users', json=user_data)
         assert create_response.status_code == 201
         
-        created_user = json.loads(create_response.data)
+        created_user = create_response.get_json()
         user_id = created_user['id']
         
         # Retrieve all users and verify our user is there
         get_response = client.get('/api/users')
         assert get_response.status_code == 200
         
-        users = json.loads(get_response.data)
+        users = get_response.get_json()['users']
         assert len(users) == 1
         assert users[0]['username'] == user_data['username']
         
@@ -296,7 +491,7 @@ class TestIntegration:
         
         # Verify user is gone
         final_get_response = client.get('/api/users')
-        final_users = json.loads(final_get_response.data)
+        final_users = final_get_response.get_json()['users']
         assert len(final_users) == 0
     
     def test_health_and_user_count_consistency(self, client, multiple_users):
@@ -304,7 +499,7 @@ class TestIntegration:
         response = client.get('/api/health')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['user_count'] == 3  # Should match the number of users created
         
         # Create another user and check again
@@ -313,12 +508,10 @@ class TestIntegration:
             'email': 'health@example.com'
         }
         
-        client.post('/api/users',
-                   data=json.dumps(new_user_data),
-                   content_type='application/json')
+        client.post('/api/users', json=new_user_data)
         
         health_response = client.get('/api/health')
-        health_data = json.loads(health_response.data)
+        health_data = health_response.get_json()
         assert health_data['user_count'] == 4
 
 
@@ -338,7 +531,6 @@ class TestErrorHandling:
         def mock_execute(*args, **kwargs):
             raise Exception("Database connection failed")
         
-        monkeypatch.setattr('sqlalchemy.text', lambda x: x)
         monkeypatch.setattr('app.db.session.execute', mock_execute)
         
         response = client.get('/')
@@ -350,62 +542,73 @@ class TestErrorHandling:
         def mock_execute(*args, **kwargs):
             raise Exception("Database connection failed")
         
-        monkeypatch.setattr('sqlalchemy.text', lambda x: x)
         monkeypatch.setattr('app.db.session.execute', mock_execute)
         
         response = client.get('/health')
         assert response.status_code == 500
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'unhealthy'
         assert 'Database connection failed' in data['error']
     
+    def test_database_write_error_in_health(self, client, monkeypatch):
+        """Test health endpoint handles errors recording the health check"""
+        def mock_commit(*args, **kwargs):
+            raise Exception("Database write failed")
+        
+        monkeypatch.setitem(app.config, 'HEALTH_PERSIST', True)
+        monkeypatch.setattr('app.db.session.commit', mock_commit)
+        
+        response = client.get('/health')
+        assert response.status_code == 500
+        
+        data = response.get_json()
+        assert data['status'] == 'unhealthy'
+        assert 'Database write failed' in data['error']
+    
     def test_database_connection_error_in_api_health(self, client, monkeypatch):
         """Test API health endpoint handles database connection errors"""
-        def mock_execute(*args, **kwargs):
+        def mock_scalar(*args, **kwargs):
             raise Exception("Database query failed")
         
-        monkeypatch.setattr('sqlalchemy.text', lambda x: x)
-        monkeypatch.setattr('app.db.session.execute', mock_execute)
+        monkeypatch.setattr('app.db.session.scalar', mock_scalar)
         
         response = client.get('/api/health')
         assert response.status_code == 500
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'unhealthy'
         assert 'Database query failed' in data['error']
     
     def test_get_users_database_error(self, client, monkeypatch):
         """Test get users handles database errors"""
-        def mock_query(*args, **kwargs):
+        def mock_execute(*args, **kwargs):
             raise Exception("Database query failed")
         
-        monkeypatch.setattr('models.User.query', mock_query)
+        monkeypatch.setattr('app.db.session.execute', mock_execute)
         
         response = client.get('/api/users')
         assert response.status_code == 500
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
     
     def test_create_user_database_error(self, client, monkeypatch):
         """Test create user handles database errors"""
-        def mock_add(*args, **kwargs):
-            raise Exception("Database add failed")
+        def mock_execute(*args, **kwargs):
+            raise Exception("Database insert failed")
         
-        monkeypatch.setattr('app.db.session.add', mock_add)
+        monkeypatch.setattr('app.db.session.execute', mock_execute)
         
         user_data = {
             'username': 'erroruser',
             'email': 'error@example.com'
         }
         
-        response = client.post('/api/users',
-                             data=json.dumps(user_data),
-                             content_type='application/json')
+        response = client.post('/api/users', json=user_data)
         assert response.status_code == 500
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
     
     def test_delete_user_database_error(self, client, sample_user, monkeypatch):
@@ -418,7 +621,7 @@ class TestErrorHandling:
         response = client.delete(f'/api/users/{sample_user["id"]}')
         assert response.status_code == 500
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
     
     def test_init_database_error(self, client, monkeypatch):
@@ -431,7 +634,7 @@ class TestErrorHandling:
         response = client.get('/api/database/init')
         assert response.status_code == 500
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
 
 
@@ -453,9 +656,9 @@ class TestAppInitialization:
         assert app.config['TESTING'] is True
         assert 'SQLALCHEMY_DATABASE_URI' in app.config
     
-    def test_database_initialization(self):
+    def test_database_initialization(self, flask_app):
         """Test database initialization"""
-        with app.app_context():
+        with flask_app.app_context():
             # Test that database can be created
             db.create_all()
             # Test that tables exist
@@ -473,34 +676,28 @@ class TestEdgeCases:
     
     def test_create_user_empty_json(self, client):
         """Test creating user with empty JSON"""
-        response = client.post('/api/users',
-                             data=json.dumps({}),
-                             content_type='application/json')
+        response = client.post('/api/users', json={})
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'Username and email are required' in data['error']
     
     def test_create_user_missing_username(self, client):
         """Test creating user with missing username"""
         user_data = {'email': 'test@example.com'}
-        response = client.post('/api/users',
-                             data=json.dumps(user_data),
-                             content_type='application/json')
+        response = client.post('/api/users', json=user_data)
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'Username and email are required' in data['error']
     
     def test_create_user_missing_email(self, client):
         """Test creating user with missing email"""
         user_data = {'username': 'testuser'}
-        response = client.post('/api/users',
-                             data=json.dumps(user_data),
-                             content_type='application/json')
+        response = client.post('/api/users', json=user_data)
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'Username and email are required' in data['error']
     
     def test_create_user_invalid_json(self, client):
@@ -515,15 +712,15 @@ class TestEdgeCases:
         response = client.delete('/api/users/99999')
         assert response.status_code == 404
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'User not found' in data['error']
     
     def test_index_with_database_error_fetching_users(self, client, monkeypatch):
         """Test index route handles errors when fetching users"""
-        def mock_query(*args, **kwargs):
+        def mock_execute(*args, **kwargs):
             raise Exception("User query failed")
         
-        monkeypatch.setattr('models.User.query', mock_query)
+        monkeypatch.setattr('app.db.session.execute', mock_execute)
         
         response = client.get('/')
         assert response.status_code == 200
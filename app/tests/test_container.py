@@ -40,66 +40,84 @@ Production Simulation:
 
 import pytest
 import requests
-import time
-import subprocess
 import json
 import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from sqlalchemy import inspect
+from models import User, HealthCheck
 
 # pytest markers for container testing categorization
 
+TEST_APP_URL = os.environ.get('TEST_APP_URL', 'http://localhost:5000')
+
+# A missing container should fail fast rather than wait on retries
+HTTP_TIMEOUT = 1
+
+DOCKER_DIR = Path(__file__).resolve().parents[2] / 'docker'
+
+APPUSER_PATTERN = re.compile(r'\bappuser\b')
+USER_DIRECTIVE_PATTERN = re.compile(r'^USER\s+appuser', re.M)
+
+
+@pytest.fixture(scope="session")
+def http():
+    """Share one HTTP session (and its TCP connections) across container tests"""
+    with requests.Session() as session:
+        # Both endpoints live on one host, so one pooled connection is reused
+        adapter = HTTPAdapter(max_retries=0, pool_connections=1, pool_maxsize=2)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        yield session
+
+
+@pytest.fixture(scope="session")
+def dockerfile_text():
+    """Read the Dockerfile once per session"""
+    return (DOCKER_DIR / 'Dockerfile').read_text()
+
+
+@pytest.fixture(scope="session")
+def dockerignore_text():
+    """Read the .dockerignore once per session"""
+    return (DOCKER_DIR / '.dockerignore').read_text()
+
 
 @pytest.mark.container
 @pytest.mark.integration
 class TestContainerIntegration:
     """Test the application running in a container"""
     
-    @pytest.fixture(scope="class", autouse=True)
-    def setup_container_environment(self):
-        """Setup test environment with containers if Docker is available"""
-        # Check if Docker is available
-        try:
-            subprocess.run(['docker', '--version'], check=True, capture_output=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pytest.skip("Docker not available for container tests")
-        
-        # Note: These tests would typically be run in a CI environment
-        # where containers are orchestrated by the CI system
-        yield
+    # Note: These tests would typically be run in a CI environment
+    # where containers are orchestrated by the CI system; conftest skips
+    # them when Docker isn't available
     
-    def test_application_health_in_container(self):
-        """Test application health when running in container"""
+    @pytest.mark.parametrize('path,extra_keys', [
+        ('/health', ()),
+        ('/api/health', ('user_count',)),
+    ])
+    def test_health_endpoints_in_container(self, http, path, extra_keys):
+        """Test application and database health when running in container"""
         # This test assumes the application is already running in a container
         # In a real CI environment, this would be set up by the CI configuration
         
-        # For now, we'll test the logic that would be used in container testing
-        health_check_url = os.environ.get('TEST_APP_URL', 'http://localhost:5000') + '/health'
-        
         try:
             # Simulate what dgoss or similar tool would do
-            response = requests.get(health_check_url, timeout=10)
+            response = http.get(TEST_APP_URL + path, timeout=HTTP_TIMEOUT)
             assert response.status_code == 200
             
             data = response.json()
             assert data['status'] == 'healthy'
+            assert data['database'] == 'connected'
             assert 'timestamp' in data
+            for key in extra_keys:
+                assert key in data
         except requests.exceptions.ConnectionError:
             # If we can't connect, skip this test (container not running)
             pytest.skip("Application container not available for testing")
-    
-    def test_database_connectivity_in_container(self):
-        """Test database connectivity when running in container"""
-        api_health_url = os.environ.get('TEST_APP_URL', 'http://localhost:5000') + '/api/health'
-        
-        try:
-            response = requests.get(api_health_url, timeout=10)
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data['status'] == 'healthy'
-            assert data['database'] == 'connected'
-            assert 'user_count' in data
-        except requests.exceptions.ConnectionError:
-            pytest.skip("Application container not available for testing")
 
 
 @pytest.mark.container
@@ -107,7 +125,7 @@ class TestContainerIntegration:
 class TestDatabaseSidecar:
     """Test database sidecar functionality"""
     
-    def test_database_connection_parameters(self):
+    def test_database_connection_parameters(self, flask_app):
         """Test that database connection parameters are correctly configured"""
         # Test the environment variables that would be used in container
         expected_env_vars = [
@@ -119,23 +137,19 @@ class TestDatabaseSidecar:
         
         # In a real test, these would be set by the CI environment
         # For now, we test the application's ability to handle these
-        from app import app
-        
-        with app.app_context():
-            db_url = app.config.get('SQLALCHEMY_DATABASE_URI')
+        with flask_app.app_context():
+            db_url = flask_app.config.get('SQLALCHEMY_DATABASE_URI')
             assert db_url is not None
             assert 'postgresql' in db_url or 'sqlite' in db_url  # Allow both for testing
     
-    def test_database_initialization(self):
+    def test_database_initialization(self, flask_app, _engine, _tables):
         """Test database initialization process"""
-        from app import db
-        from models import User, HealthCheck
-        from app import app
+        # The schema is created once per session by the _tables fixture
+        inspector = inspect(_engine)
+        assert inspector.has_table('users')
+        assert inspector.has_table('health_checks')
         
-        with app.app_context():
-            # Test that we can create tables
-            db.create_all()
-            
+        with flask_app.app_context():
             # Test that we can query the database
             user_count = User.query.count()
             assert isinstance(user_count, int)
@@ -149,25 +163,20 @@ class TestDatabaseSidecar:
 class TestContainerSecurity:
     """Test container security aspects"""
     
-    def test_non_root_user(self):
+    def test_non_root_user(self, dockerfile_text):
         """Test that the application runs as non-root user"""
         # This would typically be tested with container inspection tools
         # For now, we test the configuration
         
         # Check that our Dockerfile creates a non-root user
-        with open('../docker/Dockerfile', 'r') as f:
-            dockerfile_content = f.read()
-            assert 'appuser' in dockerfile_content
-            assert 'USER appuser' in dockerfile_content
+        assert APPUSER_PATTERN.search(dockerfile_text)
+        assert USER_DIRECTIVE_PATTERN.search(dockerfile_text)
     
-    def test_minimal_attack_surface(self):
+    def test_minimal_attack_surface(self, dockerignore_text):
         """Test that container has minimal attack surface"""
         # Check that .dockerignore excludes sensitive files
-        with open('../docker/.dockerignore', 'r') as f:
-            dockerignore_content = f.read()
-            sensitive_patterns = ['.git', '*.pyc', '.env', 'tests/']
-            for pattern in sensitive_patterns:
-                assert pattern in dockerignore_content
+        sensitive_patterns = {'.git', '*.pyc', '.env', 'tests/'}
+        assert sensitive_patterns <= set(dockerignore_text.splitlines())
 
 
 @pytest.mark.container
@@ -178,45 +187,41 @@ class TestPerformance:
     def test_application_startup_time(self):
         """Test that application starts within reasonable time"""
         # This would measure actual container startup time in CI
-        # For now, we test that the app can be imported quickly
-        start_time = time.time()
-        
-        from app import app
-        
-        end_time = time.time()
-        startup_time = end_time - start_time
+        # For now, we test that the app can be imported quickly. The import
+        # runs in a fresh interpreter: in this process app is already in
+        # sys.modules, so timing it here would only measure a cache hit
+        result = subprocess.run(
+            [sys.executable, '-c',
+             'import time; t = time.perf_counter(); import app; '
+             'print(time.perf_counter() - t)'],
+            cwd=Path(__file__).resolve().parents[1],
+            capture_output=True, text=True, check=True
+        )
+        startup_time = float(result.stdout.split()[-1])
         
         # Should import quickly (less than 2 seconds)
         assert startup_time < 2.0
     
-    def test_memory_usage_reasonable(self):
+    def test_memory_usage_reasonable(self, flask_app):
         """Test that application memory usage is reasonable"""
         # In a real container test, this would check actual memory usage
         # For now, we test that we're not doing obviously expensive operations at startup
         
-        from app import app
-        import sys
-        
-        # Check that we're not loading unnecessary large modules
-        loaded_modules = list(sys.modules.keys())
-        
         # Should not have heavy ML or data science libraries loaded
-        heavy_modules = ['tensorflow', 'torch', 'pandas', 'numpy']
-        for module in heavy_modules:
-            assert module not in loaded_modules
+        heavy_modules = ('tensorflow', 'torch', 'pandas', 'numpy')
+        assert not any(module in sys.modules for module in heavy_modules)
 
 
 @pytest.mark.container
 class TestEnvironmentConfiguration:
     """Test environment-specific configuration"""
     
-    def test_production_configuration(self):
+    def test_production_configuration(self, flask_app, monkeypatch):
         """Test production environment configuration"""
-        from app import app
-        
         # Test that debug mode can be disabled
-        app.config['DEBUG'] = False
-        assert app.config['DEBUG'] is False
+        # (monkeypatch keeps the session-wide app's config unchanged)
+        monkeypatch.setitem(flask_app.config, 'DEBUG', False)
+        assert flask_app.config['DEBUG'] is False
         
         # Test that we have proper production settings
         expected_prod_configs = [
@@ -226,16 +231,14 @@ class TestEnvironmentConfiguration:
         
         for config in expected_prod_configs:
             # These should be configurable via environment
-            assert config in app.config or config in os.environ
+            assert config in flask_app.config or config in os.environ
     
-    def test_development_configuration(self):
+    def test_development_configuration(self, flask_app, monkeypatch):
         """Test development environment configuration"""
-        from app import app
-        
         # Test that development mode works
-        app.config['DEBUG'] = True
-        assert app.config['DEBUG'] is True
+        monkeypatch.setitem(flask_app.config, 'DEBUG', True)
+        assert flask_app.config['DEBUG'] is True
         
         # Test that we can use SQLite for development
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-        assert 'sqlite' in app.config['SQLALCHEMY_DATABASE_URI']
+        monkeypatch.setitem(flask_app.config, 'SQLALCHEMY_DATABASE_URI', 'sqlite:///:memory:')
+        assert 'sqlite' in flask_app.config['SQLALCHEMY_DATABASE_URI']
@@ -6,12 +6,12 @@
 -- This script only inserts initial data
 
 -- Insert sample data for development (only if not exists)
-INSERT INTO users (username, email) 
-SELECT 'admin', 'admin@example.com'
+INSERT INTO users (username, email, created_at) 
+SELECT 'admin', 'admin@example.com', CURRENT_TIMESTAMP
 WHERE NOT EXISTS (SELECT 1 FROM users WHERE username = 'admin');
 
-INSERT INTO users (username, email) 
-SELECT 'demo', 'demo@example.com'
+INSERT INTO users (username, email, created_at) 
+SELECT 'demo', 'demo@example.com', CURRENT_TIMESTAMP
 WHERE NOT EXISTS (SELECT 1 FROM users WHERE username = 'demo');
 
 -- Insert initial health check record